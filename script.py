@@ -1,14 +1,20 @@
 import os
 import json
+import asyncio
 import sys
 import logging
-from typing import Dict, Any
+import ciso8601
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from colorama import Fore, Style, init
 from flask import Flask
 
 init(autoreset=True)
 
-from utils.coin_market import CoinMarketCapAPI
+from utils.coin_market import CoinMarketCapAPI, AsyncCoinMarketCapAPI
 from utils.posgres_pool import PostgresManager, DatabaseError
 
 class ColoredFormatter(logging.Formatter):
@@ -20,12 +26,18 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': Fore.RED + Style.BRIGHT
     }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wraps = {level: (color, Style.RESET_ALL) for level, color in self.COLORS.items()}
+
     def format(self, record):
-        levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{Style.RESET_ALL}"
-            record.msg = f"{self.COLORS[levelname]}{record.msg}{Style.RESET_ALL}"
-        return super().format(record)
+        # Color the formatted line instead of rewriting the record, so a
+        # record shared with other handlers is left untouched
+        wrap = self._wraps.get(record.levelname)
+        if wrap is None:
+            return super().format(record)
+        pre, post = wrap
+        return f"{pre}{super().format(record)}{post}"
 
 logger = logging.getLogger('crypto_job')
 logger.setLevel(logging.INFO)
@@ -34,40 +46,92 @@ formatter = ColoredFormatter('%(asctime)s [%(levelname)s] %(message)s', datefmt=
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
-def insert_crypto_data(api_response: Dict[str, Any]) -> int:
+COPY_THRESHOLD = 500
+CMC_PAGE_SIZE = 200
+DB_POOL_MIN_CONNECTIONS = 4
+CRYPTO_COLUMNS = ("name", "symbol", "rank", "price_usd", "volume_24h_usd", "market_cap_usd", "last_updated")
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS cryptocurrency_data (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        symbol VARCHAR(10) NOT NULL,
+        rank INT,
+        price_usd DECIMAL(20, 10),
+        volume_24h_usd DECIMAL(20, 10),
+        market_cap_usd DECIMAL(20, 10),
+        last_updated TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (name, symbol, last_updated)
+    );
+"""
+
+def _parse_last_updated(value: Any) -> Optional[datetime]:
+    try:
+        return ciso8601.parse_datetime_as_naive(value)
+    except (ValueError, TypeError):
+        return None
+
+def _build_row(item: Dict[str, Any]) -> Tuple[Optional[Tuple], Optional[str]]:
+    # Returns (row, None) for a usable record, or (None, reason) when it is skipped
+    if not isinstance(item, dict):
+        return None, "malformed_record"
+    quote = item.get("quote")
+    if not quote:
+        return None, "missing_quote"
+    if not isinstance(quote, dict):
+        return None, "malformed_quote"
+    quote_usd = quote.get("USD")
+    if not quote_usd:
+        return None, "missing_quote"
+    if not isinstance(quote_usd, dict):
+        return None, "malformed_quote"
+    for field in ("name", "symbol"):
+        if not item.get(field):
+            return None, f"missing_{field}"
+    for field in ("price", "last_updated"):
+        if not quote_usd.get(field):
+            return None, f"missing_{field}"
+    last_updated = _parse_last_updated(quote_usd["last_updated"])
+    if last_updated is None:
+        return None, "invalid_last_updated"
+    return (item["name"], item["symbol"], item.get("cmc_rank"), quote_usd["price"],
+            quote_usd.get("volume_24h"), quote_usd.get("market_cap"), last_updated), None
+
+def insert_crypto_data(api_response: Dict[str, Any], db_manager: PostgresManager) -> int:
     logger.info("Processing cryptocurrency data for database insertion")
 
     records_inserted = 0
     data_to_insert = []
-    for item in api_response.get("data", []):
-        try:
-            name = item.get("name")
-            symbol = item.get("symbol")
-            cmc_rank = item.get("cmc_rank")
-            quote_usd = item.get("quote", {}).get("USD", {})
-            price = quote_usd.get("price")
-            volume_24h = quote_usd.get("volume_24h")
-            market_cap = quote_usd.get("market_cap")
-            last_updated_str = quote_usd.get("last_updated")
-
-            if all([name, symbol, price, last_updated_str]):
-                last_updated = last_updated_str.replace('T', ' ').replace('Z', '')
-                data_to_insert.append((name, symbol, cmc_rank, price, volume_24h, market_cap, last_updated))
-            else:
-                logger.warning(f"Skipping incomplete record: {item.get('name', 'N/A')}")
-        except Exception as e:
-            logger.error(f"Error processing item: {item.get('name', 'N/A')} - {e}")
+    skipped = Counter()
+    log_items = logger.isEnabledFor(logging.DEBUG)
+    for item in api_response.get("data", ()):
+        row, reason = _build_row(item)
+        if reason is None:
+            data_to_insert.append(row)
             continue
+        skipped[reason] += 1
+        if log_items:
+            name = item.get("name", "N/A") if isinstance(item, dict) else "N/A"
+            logger.debug("Skipping invalid record %s: %s", name, reason)
+
+    if skipped:
+        logger.warning("Skipped %d invalid records: %s", sum(skipped.values()), dict(skipped))
 
     if data_to_insert:
         insert_query = """
             INSERT INTO cryptocurrency_data (name, symbol, rank, price_usd, volume_24h_usd, market_cap_usd, last_updated)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            VALUES %s
             ON CONFLICT (name, symbol, last_updated) DO NOTHING;
         """
         try:
-            with PostgresManager() as db_manager:
-                db_manager.execute_batch(insert_query, data_to_insert)
+            with db_manager.transaction() as cursor:
+                # Losing the last few snapshots on a server crash is acceptable
+                # for this table, so don't wait for the WAL flush on commit
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                if len(data_to_insert) > COPY_THRESHOLD:
+                    db_manager.copy_insert("cryptocurrency_data", CRYPTO_COLUMNS, data_to_insert, cursor=cursor)
+                else:
+                    db_manager.execute_batch(insert_query, data_to_insert, cursor=cursor)
             records_inserted = len(data_to_insert)
             logger.info(f"Successfully inserted/updated {records_inserted} records into the database.")
         except DatabaseError as e:
@@ -77,6 +141,32 @@ def insert_crypto_data(api_response: Dict[str, Any]) -> int:
         logger.info("No valid data to insert.")
     return records_inserted
 
+@lru_cache(maxsize=None)
+def get_cmc_client(api_key: str) -> CoinMarketCapAPI:
+    # One client per process so its session keeps the connection alive across jobs
+    return CoinMarketCapAPI(api_key)
+
+@lru_cache(maxsize=None)
+def get_db_manager() -> PostgresManager:
+    # The pool is shared process-wide and pre-warmed so requests do not pay
+    # for connection setup
+    db_manager = PostgresManager(min_connections=DB_POOL_MIN_CONNECTIONS)
+    db_manager.initialize_pool()
+    return db_manager
+
+@lru_cache(maxsize=None)
+def ensure_schema() -> None:
+    # Runs the DDL once per process; later calls are a cache hit
+    get_db_manager().execute_query(CREATE_TABLE_SQL)
+    logger.info("Database table 'cryptocurrency_data' ensured.")
+
+def fetch_listings(api_key: str, limit: int) -> Dict[str, Any]:
+    if limit > CMC_PAGE_SIZE:
+        return asyncio.run(
+            AsyncCoinMarketCapAPI(api_key).get_all_listings(limit, page_size=CMC_PAGE_SIZE)
+        )
+    return get_cmc_client(api_key).get_latest_listings(limit=limit)
+
 def run_data_collection_job():
     job_status = "SUCCESS"
     logger.info("╔══════════════════════════════════════════════════════╗")
@@ -89,40 +179,26 @@ def run_data_collection_job():
             logger.critical("COINMARKETCAP_API_KEY environment variable not set. Exiting.")
             sys.exit(1)
 
-        client = CoinMarketCapAPI(api_key)
-
-        logger.info("Connecting to PostgreSQL database...")
-        with PostgresManager() as db_manager:
-            db_manager.initialize_pool()
-            logger.info("Successfully connected to PostgreSQL")
-
-            db_manager.execute_query("""
-                CREATE TABLE IF NOT EXISTS cryptocurrency_data (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    symbol VARCHAR(10) NOT NULL,
-                    rank INT,
-                    price_usd DECIMAL(20, 10),
-                    volume_24h_usd DECIMAL(20, 10),
-                    market_cap_usd DECIMAL(20, 10),
-                    last_updated TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (name, symbol, last_updated)
-                );
-            """)
-            logger.info("Database table 'cryptocurrency_data' ensured.")
-
-            logger.info("Fetching data from CoinMarketCap API")
-            api_response = client.get_latest_listings()
-
-            if "error" in api_response:
-                logger.error(f"API Error: {api_response['error']}")
-                job_status = "FAILED"
-                return {"status": "error", "message": api_response["error"]}, 500
-
-            insert_crypto_data(api_response)
-            logger.info("✅ Job completed successfully")
-            job_status = "SUCCESS"
+        listings_limit = int(os.environ.get("CMC_LISTINGS_LIMIT", CMC_PAGE_SIZE))
+
+        # The database setup and the API call are independent, so overlap them
+        logger.info("Connecting to PostgreSQL database and fetching data from CoinMarketCap API")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            schema_future = executor.submit(ensure_schema)
+            listings_future = executor.submit(fetch_listings, api_key, listings_limit)
+            schema_future.result()
+            api_response = listings_future.result()
+        db_manager = get_db_manager()
+        logger.info("Successfully connected to PostgreSQL")
+
+        if "error" in api_response:
+            logger.error(f"API Error: {api_response['error']}")
+            job_status = "FAILED"
+            return {"status": "error", "message": api_response["error"]}, 500
+
+        insert_crypto_data(api_response, db_manager)
+        logger.info("✅ Job completed successfully")
+        job_status = "SUCCESS"
 
     except ImportError:
         logger.error("Failed to import required modules. Check that all dependencies are installed")
@@ -161,5 +237,9 @@ def index():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
+    try:
+        ensure_schema()
+    except Exception as e:
+        logger.error(f"Could not ensure database schema at startup, retrying on first job: {e}")
     logger.info(f"Starting Flask application on port {port}")
     app.run(debug=False, host="0.0.0.0", port=port)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import web
+
+from utils.coin_market import AsyncCoinMarketCapAPI
+
+
+def _run_against(handler, coroutine_factory):
+    # Serves handler on a free local port and runs the client coroutine against it
+    async def run():
+        app = web.Application()
+        app.router.add_get("/v1/cryptocurrency/listings/latest", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            client = AsyncCoinMarketCapAPI("test-key")
+            client.BASE_URL = f"http://127.0.0.1:{port}/v1"
+            return await coroutine_factory(client)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def _listing_page(request):
+    start = int(request.query["start"])
+    limit = int(request.query["limit"])
+    return web.json_response({
+        "status": {"error_code": 0},
+        "data": [{"id": i} for i in range(start, start + limit)]
+    })
+
+
+def test_get_all_listings_requests_a_shorter_last_page():
+    limits = []
+
+    async def handler(request):
+        limits.append(int(request.query["limit"]))
+        return _listing_page(request)
+
+    result = _run_against(handler, lambda client: client.get_all_listings(450, page_size=200))
+
+    assert sorted(limits) == [50, 200, 200]
+    assert [item["id"] for item in result["data"]] == list(range(1, 451))
+
+
+def test_rate_limited_page_is_retried_after_retry_after():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.query["start"])
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return _listing_page(request)
+
+    result = _run_against(handler, lambda client: client.get_all_listings(10, page_size=200))
+
+    assert calls == ["1", "1"]
+    assert len(result["data"]) == 10
+
+
+def test_client_error_is_returned_without_retrying():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.query["start"])
+        return web.Response(status=400, text="bad request")
+
+    result = _run_against(handler, lambda client: client.get_all_listings(10, page_size=200))
+
+    assert calls == ["1"]
+    assert "400" in result["error"]
+
+
+@pytest.mark.parametrize("total", [0, -5])
+def test_non_positive_total_returns_no_data(total):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.query["start"])
+        return _listing_page(request)
+
+    result = _run_against(handler, lambda client: client.get_all_listings(total))
+
+    assert calls == []
+    assert result["data"] == []
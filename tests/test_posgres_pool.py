@@ -0,0 +1,89 @@
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from utils.posgres_pool import _copy_text_row
+
+
+def test_copy_text_row_escapes_special_characters():
+    row = ("a\rb", "c\nd", 'say "hi"', "x,y", "\\.", None, "t\tu", 1.5)
+
+    line = _copy_text_row(row)
+
+    assert line == 'a\\rb\tc\\nd\tsay "hi"\tx,y\t\\\\.\t\\N\tt\\tu\t1.5\n'
+
+
+def test_copy_text_row_keeps_one_line_per_row():
+    line = _copy_text_row(("\\.", "a\r\nb"))
+
+    assert line.count("\n") == 1 and line.endswith("\n")
+    assert "\r" not in line
+    assert not line.startswith("\\.\t") and line != "\\.\n"
+
+
+def test_copy_text_row_distinguishes_null_from_empty_string():
+    assert _copy_text_row((None, "")) == "\\N\t\n"
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def waiting_pool(monkeypatch):
+    import psycopg2
+    from utils.posgres_pool import _WaitingConnectionPool
+
+    monkeypatch.setattr(psycopg2, "connect", lambda *args, **kwargs: _FakeConnection())
+    # minconn=0 so connections returned with putconn are closed, not kept idle
+    return _WaitingConnectionPool(0, 2, timeout=0.05)
+
+
+def test_getconn_times_out_when_all_slots_are_taken(waiting_pool):
+    from psycopg2 import pool
+
+    waiting_pool.getconn()
+    waiting_pool.getconn()
+
+    with pytest.raises(pool.PoolError, match="no connection available"):
+        waiting_pool.getconn()
+
+
+def test_foreign_putconn_raises_without_freeing_a_slot(waiting_pool):
+    from psycopg2 import pool
+
+    waiting_pool.getconn()
+    waiting_pool.getconn()
+
+    with pytest.raises(pool.PoolError):
+        waiting_pool.putconn(_FakeConnection())
+    with pytest.raises(pool.PoolError, match="no connection available"):
+        waiting_pool.getconn()
+
+
+def test_repeated_putconn_raises_without_freeing_a_slot(waiting_pool):
+    from psycopg2 import pool
+
+    connection = waiting_pool.getconn()
+    waiting_pool.getconn()
+    waiting_pool.putconn(connection)
+    waiting_pool.getconn()
+
+    with pytest.raises(pool.PoolError):
+        waiting_pool.putconn(connection)
+    with pytest.raises(pool.PoolError, match="no connection available"):
+        waiting_pool.getconn()
+
+
+def test_putconn_with_close_frees_a_slot(waiting_pool):
+    connection = waiting_pool.getconn()
+    waiting_pool.getconn()
+
+    waiting_pool.putconn(connection, close=True)
+
+    assert connection.closed
+    assert waiting_pool.getconn() is not connection
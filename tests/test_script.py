@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("flask")
+
+from script import _build_row
+
+VALID_QUOTE = {"USD": {"price": 1.5, "last_updated": "2024-01-01T00:00:00.000Z"}}
+
+
+def test_build_row_returns_row_for_valid_record():
+    row, reason = _build_row({"name": "a", "symbol": "b", "cmc_rank": 1, "quote": VALID_QUOTE})
+
+    assert reason is None
+    assert row == ("a", "b", 1, 1.5, None, None, datetime.datetime(2024, 1, 1))
+
+
+@pytest.mark.parametrize("item, expected", [
+    ("not a dict", "malformed_record"),
+    ({"name": "a", "symbol": "b"}, "missing_quote"),
+    ({"name": "a", "symbol": "b", "quote": "str"}, "malformed_quote"),
+    ({"name": "a", "symbol": "b", "quote": {"USD": ["x"]}}, "malformed_quote"),
+    ({"symbol": "b", "quote": VALID_QUOTE}, "missing_name"),
+    ({"name": "a", "symbol": "b", "quote": {"USD": {"price": 1, "last_updated": "garbage"}}},
+     "invalid_last_updated"),
+    ({"name": "a", "symbol": "b", "quote": {"USD": {"price": 1, "last_updated": 123}}},
+     "invalid_last_updated"),
+])
+def test_build_row_reports_why_a_record_is_skipped(item, expected):
+    assert _build_row(item) == (None, expected)
@@ -1,8 +1,16 @@
+import asyncio
+import aiohttp
+import orjson
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Optional, Tuple
+from urllib3.util.retry import Retry
 
-class CoinMarketCapAPI:
+class _CoinMarketCapClient:
     BASE_URL = "https://pro-api.coinmarketcap.com/v1"
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.3
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
 
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -11,21 +19,91 @@ class CoinMarketCapAPI:
             'Accept': 'application/json'
         }
 
-    def get_latest_listings(self, start: int = 1, limit: int = 200,
-                            convert: str = 'USD') -> Dict[str, Any]:
+    def _listings_request(self, start: int, limit: int,
+                          convert: str) -> Tuple[str, Dict[str, Any]]:
         endpoint = f"{self.BASE_URL}/cryptocurrency/listings/latest"
         params = {
             'start': start,
             'limit': limit,
             'convert': convert
         }
+        return endpoint, params
+
+class CoinMarketCapAPI(_CoinMarketCapClient):
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=self.MAX_RETRIES, backoff_factor=self.BACKOFF_FACTOR,
+                              status_forcelist=list(self.RETRY_STATUSES))
+        ))
 
+    def get_latest_listings(self, start: int = 1, limit: int = 200,
+                            convert: str = 'USD') -> Dict[str, Any]:
+        endpoint, params = self._listings_request(start, limit, convert)
         return self._make_request(endpoint, params)
 
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            response = self.session.get(endpoint, params=params, timeout=(3.05, 27))
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return orjson.loads(response.content)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             return {"error": str(e)}
+
+class AsyncCoinMarketCapAPI(_CoinMarketCapClient):
+    async def get_all_listings(self, total: int, page_size: int = 200,
+                               convert: str = 'USD') -> Dict[str, Any]:
+        async with self._session() as session:
+            pages = await asyncio.gather(*[
+                self._fetch(session, start, min(page_size, total - start + 1), convert)
+                for start in range(1, total + 1, page_size)
+            ])
+
+        for page in pages:
+            if "error" in page:
+                return page
+        return {
+            "status": pages[0].get("status") if pages else None,
+            "data": [item for page in pages for item in page.get("data", [])]
+        }
+
+    def _session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        # Same schedule as the sync client's urllib3 Retry, honouring the
+        # server's Retry-After when a rate-limited response carries one
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.BACKOFF_FACTOR * (2 ** attempt)
+
+    async def _fetch(self, session: aiohttp.ClientSession, start: int, limit: int,
+                     convert: str) -> Dict[str, Any]:
+        endpoint, params = self._listings_request(start, limit, convert)
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            retries_left = attempt < self.MAX_RETRIES
+            try:
+                async with session.get(endpoint, params=params) as response:
+                    if response.status in self.RETRY_STATUSES and retries_left:
+                        delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                    else:
+                        response.raise_for_status()
+                        return orjson.loads(await response.read())
+            except aiohttp.ClientResponseError as e:
+                return {"error": str(e)}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not retries_left:
+                    return {"error": str(e) or type(e).__name__}
+                delay = self._retry_delay(attempt)
+            except orjson.JSONDecodeError as e:
+                return {"error": str(e)}
+            await asyncio.sleep(delay)
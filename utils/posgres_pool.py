@@ -1,9 +1,57 @@
+import atexit
+import io
 import os
+import re
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extras
 from psycopg2 import pool
-from typing import Any, Dict, List, Tuple, Optional, Union
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Optional, Union
+
+_VALUES_PLACEHOLDER = re.compile(r"\bVALUES\s+%s", re.IGNORECASE)
+# Statements grouped per round-trip when a query cannot be rewritten as
+# multi-row VALUES; a power of two keeps partial pages few.
+_STATEMENT_PAGE_SIZE = 128
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _copy_text_row(row: Sequence[Any]) -> str:
+    # COPY text format: NULL is \N and backslash, tab, newline and carriage
+    # return are escaped, so no value can end a row or the data early
+    return "\t".join(
+        "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+        for value in row
+    ) + "\n"
+
+class _WaitingConnectionPool(pool.ThreadedConnectionPool):
+    # ThreadedConnectionPool raises PoolError as soon as maxconn connections
+    # are checked out; callers here wait for a free slot instead.
+    def __init__(self, minconn: int, maxconn: int, *args, timeout: float = 30.0, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self._timeout):
+            raise pool.PoolError(f"no connection available within {self._timeout}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        # Only a connection the pool actually took back frees a slot, so a
+        # bad or repeated putconn surfaces the pool's own PoolError
+        super().putconn(conn, key, close=close)
+        self._slots.release()
 
 class PostgresManager:
+    # Pools are shared by every manager pointing at the same database, so
+    # they outlive a single "with" block or request.
+    _pools = {}
+    _pools_lock = threading.Lock()
+
     def __init__(
         self,
         host: str = None,
@@ -12,7 +60,8 @@ class PostgresManager:
         user: str = None,
         password: str = None,
         min_connections: int = 1,
-        max_connections: int = 10
+        max_connections: int = 10,
+        pool_timeout: float = 30.0
     ):
         self.host = host or os.environ.get("DB_HOST", "localhost")
         self.port = port or os.environ.get("DB_PORT", "5432")
@@ -23,16 +72,27 @@ class PostgresManager:
         if not all([self.database, self.user, self.password]):
             raise ValueError("Database name, user, and password must be provided.")
 
-        self.connection_pool = None
         self.min_connections = min_connections
         self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self._pool_key = (self.host, self.port, self.database, self.user)
+
+    @property
+    def connection_pool(self) -> Optional[_WaitingConnectionPool]:
+        return self._pools.get(self._pool_key)
 
     def initialize_pool(self) -> None:
-        if self.connection_pool is None:
+        if self.connection_pool is not None:
+            return
+
+        with self._pools_lock:
+            if self._pool_key in self._pools:
+                return
             try:
-                self.connection_pool = pool.ThreadedConnectionPool(
+                self._pools[self._pool_key] = _WaitingConnectionPool(
                     self.min_connections,
                     self.max_connections,
+                    timeout=self.pool_timeout,
                     host=self.host,
                     port=self.port,
                     database=self.database,
@@ -91,35 +151,147 @@ class PostgresManager:
             if connection:
                 self.release_connection(connection)
 
-    def execute_batch(self, query: str, params_list: List[Union[Tuple, Dict]]) -> None:
+    def execute_batch(
+        self,
+        query: str,
+        params_list: List[Union[Tuple, Dict]],
+        page_size: int = 1000,
+        cursor: Any = None
+    ) -> None:
+        if cursor is not None:
+            self._execute_batch(cursor, query, params_list, page_size)
+            return
+
         connection = None
         try:
             connection, cursor = self.get_connection()
+            self._execute_batch(cursor, query, params_list, page_size)
+            connection.commit()
+        except psycopg2.Error as e:
+            if connection:
+                connection.rollback()
+            raise DatabaseError(f"Batch execution failed: {e}")
+        finally:
+            if connection:
+                self.release_connection(connection)
+
+    def _execute_batch(
+        self,
+        cursor: Any,
+        query: str,
+        params_list: List[Union[Tuple, Dict]],
+        page_size: int
+    ) -> None:
+        # Queries written as "VALUES %s" are expanded into multi-row
+        # statements of up to page_size rows, one round-trip per page;
+        # any other query is pipelined _STATEMENT_PAGE_SIZE rows at a time.
+        if _VALUES_PLACEHOLDER.search(query):
+            psycopg2.extras.execute_values(cursor, query, params_list, page_size=page_size)
+        else:
+            psycopg2.extras.execute_batch(cursor, query, params_list, page_size=_STATEMENT_PAGE_SIZE)
 
-            for params in params_list:
-                cursor.execute(query, params)
+    def copy_insert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: List[Sequence[Any]],
+        staging_table: Optional[str] = None,
+        cursor: Any = None
+    ) -> None:
+        if cursor is not None:
+            self._copy_insert(cursor, table, columns, rows, staging_table)
+            return
 
+        connection = None
+        try:
+            connection, cursor = self.get_connection()
+            self._copy_insert(cursor, table, columns, rows, staging_table)
             connection.commit()
         except psycopg2.Error as e:
             if connection:
                 connection.rollback()
-            raise DatabaseError(f"Batch execution failed: {e}")
+            raise DatabaseError(f"Copy insert failed: {e}")
         finally:
             if connection:
                 self.release_connection(connection)
 
+    def _copy_insert(
+        self,
+        cursor: Any,
+        table: str,
+        columns: Sequence[str],
+        rows: List[Sequence[Any]],
+        staging_table: Optional[str]
+    ) -> None:
+        # Stream rows into a temp table with COPY, then merge them so that
+        # duplicates are skipped the same way ON CONFLICT DO NOTHING would.
+        staging_table = staging_table or f"tmp_{table}"
+        column_list = ", ".join(columns)
+
+        buffer = io.StringIO()
+        buffer.writelines(_copy_text_row(row) for row in rows)
+        buffer.seek(0)
+
+        # Only the copied columns are staged; LIKE ... INCLUDING DEFAULTS would
+        # also bring the id default along and burn a sequence value per row.
+        cursor.execute(
+            f"CREATE TEMP TABLE {staging_table} AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        )
+        cursor.copy_expert(
+            f"COPY {staging_table} ({column_list}) FROM STDIN WITH (FORMAT text)",
+            buffer
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT {column_list} FROM {staging_table} "
+            "ON CONFLICT DO NOTHING"
+        )
+        # Dropped in the same transaction, so a rollback discards it as well
+        cursor.execute(f"DROP TABLE {staging_table}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        # Everything run on the yielded cursor is committed once on exit,
+        # or rolled back together if any statement fails.
+        connection, cursor = self.get_connection()
+        try:
+            yield cursor
+            connection.commit()
+        except psycopg2.Error as e:
+            connection.rollback()
+            raise DatabaseError(f"Transaction failed: {e}")
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self.release_connection(connection)
+
     def close_pool(self) -> None:
-        if self.connection_pool is not None:
-            self.connection_pool.closeall()
-            self.connection_pool = None
+        with self._pools_lock:
+            connection_pool = self._pools.pop(self._pool_key, None)
+        if connection_pool is not None:
+            connection_pool.closeall()
             print("Connection pool closed")
 
+    @classmethod
+    def _shutdown(cls) -> None:
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for connection_pool in pools:
+            connection_pool.closeall()
+
     def __enter__(self):
         self.initialize_pool()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close_pool()
+        # The shared pool stays open for the next caller; it is closed
+        # explicitly with close_pool() or when the process exits.
+        pass
+
+atexit.register(PostgresManager._shutdown)
 
 class DatabaseError(Exception):
     pass